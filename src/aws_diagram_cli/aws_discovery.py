@@ -1,20 +1,48 @@
 """AWS resource discovery functions."""
 
 import logging
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
 import boto3
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Worker threads used for independent per-resource API calls
+DEFAULT_MAX_WORKERS = 8
+
+# Response pagination keys mapped to the request parameters they feed
+_NEXT_TOKENS = {"NextToken": "NextToken"}
+_MARKER_TOKENS = {"NextMarker": "Marker"}
+_RECORD_SET_TOKENS = {
+    "NextRecordName": "StartRecordName",
+    "NextRecordType": "StartRecordType",
+    "NextRecordIdentifier": "StartRecordIdentifier",
+}
+
+# Largest page size each listing API accepts, to cut round trips on large accounts
+_EC2_MAX_RESULTS = 1000
+_ELBV2_PAGE_SIZE = 400
+_RDS_MAX_RECORDS = 100
+_ACM_MAX_ITEMS = 1000
+
+# Route53 record types that can point at a load balancer
+_ROUTE53_RECORD_TYPES = frozenset(["A", "AAAA", "CNAME"])
+
 
 class AWSResourceDiscovery:
     """Discovers AWS resources for diagram generation."""
     
-    def __init__(self, regions: List[str] = None, profile: Optional[str] = None):
+    def __init__(
+        self,
+        regions: List[str] = None,
+        profile: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ):
         if regions is None:
             regions = ["us-east-1"]
         self.regions = regions
+        self.max_workers = max_workers
         self.session = boto3.Session(profile_name=profile) if profile else boto3.Session()
         
         # Create clients for each region
@@ -50,17 +78,17 @@ class AWSResourceDiscovery:
         for region in self.regions:
             try:
                 ec2_client = self.regional_clients[region]['ec2']
-                response = ec2_client.describe_vpcs()
-                for vpc in response["Vpcs"]:
-                    vpc_info = {
-                        "vpc_id": vpc["VpcId"],
-                        "cidr_block": vpc["CidrBlock"],
-                        "state": vpc["State"],
-                        "is_default": vpc.get("IsDefault", False),
-                        "region": region,
-                        "tags": self._process_tags(vpc.get("Tags", []))
-                    }
-                    all_vpcs.append(vpc_info)
+                for page in self._iter_pages(ec2_client.describe_vpcs, MaxResults=_EC2_MAX_RESULTS):
+                    for vpc in page["Vpcs"]:
+                        vpc_info = {
+                            "vpc_id": vpc["VpcId"],
+                            "cidr_block": vpc["CidrBlock"],
+                            "state": vpc["State"],
+                            "is_default": vpc.get("IsDefault", False),
+                            "region": region,
+                            "tags": self._process_tags(vpc.get("Tags", []))
+                        }
+                        all_vpcs.append(vpc_info)
             except ClientError as e:
                 logger.error(f"Error discovering VPCs in region {region}: {e}")
         return all_vpcs
@@ -68,26 +96,31 @@ class AWSResourceDiscovery:
     def discover_subnets(self, vpc_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Discover subnets across all regions."""
         all_subnets = []
+        
+        # Filters are the same in every region, so build them once
+        filters = []
+        if vpc_id:
+            filters.append({"Name": "vpc-id", "Values": [vpc_id]})
+        
         for region in self.regions:
             try:
                 ec2_client = self.regional_clients[region]['ec2']
-                filters = []
-                if vpc_id:
-                    filters.append({"Name": "vpc-id", "Values": [vpc_id]})
-                
-                response = ec2_client.describe_subnets(Filters=filters)
-                for subnet in response["Subnets"]:
-                    subnet_info = {
-                        "subnet_id": subnet["SubnetId"],
-                        "vpc_id": subnet["VpcId"],
-                        "cidr_block": subnet["CidrBlock"],
-                        "availability_zone": subnet["AvailabilityZone"],
-                        "state": subnet["State"],
-                        "region": region,
-                        "tags": self._process_tags(subnet.get("Tags", [])),
-                        "tier": self._determine_subnet_tier(subnet)
-                    }
-                    all_subnets.append(subnet_info)
+                for page in self._iter_pages(
+                    ec2_client.describe_subnets, Filters=filters, MaxResults=_EC2_MAX_RESULTS
+                ):
+                    for subnet in page["Subnets"]:
+                        tags = self._process_tags(subnet.get("Tags", []))
+                        subnet_info = {
+                            "subnet_id": subnet["SubnetId"],
+                            "vpc_id": subnet["VpcId"],
+                            "cidr_block": subnet["CidrBlock"],
+                            "availability_zone": subnet["AvailabilityZone"],
+                            "state": subnet["State"],
+                            "region": region,
+                            "tags": tags,
+                            "tier": self._determine_subnet_tier(tags)
+                        }
+                        all_subnets.append(subnet_info)
             except ClientError as e:
                 logger.error(f"Error discovering subnets in region {region}: {e}")
         return all_subnets
@@ -95,31 +128,37 @@ class AWSResourceDiscovery:
     def discover_ec2_instances(self, vpc_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Discover EC2 instances across all regions."""
         all_instances = []
+        
+        # Only running instances are drawn, so let the API drop the rest; the
+        # filters are the same in every region, so build them once
+        filters = [{"Name": "instance-state-name", "Values": ["running"]}]
+        if vpc_id:
+            filters.append({"Name": "vpc-id", "Values": [vpc_id]})
+        
         for region in self.regions:
             try:
                 ec2_client = self.regional_clients[region]['ec2']
-                filters = []
-                if vpc_id:
-                    filters.append({"Name": "vpc-id", "Values": [vpc_id]})
-                
-                response = ec2_client.describe_instances(Filters=filters)
-                for reservation in response["Reservations"]:
-                    for instance in reservation["Instances"]:
-                        if instance["State"]["Name"] == "running":
-                            instance_info = {
-                                "instance_id": instance["InstanceId"],
-                                "instance_type": instance["InstanceType"],
-                                "private_ip": instance.get("PrivateIpAddress"),
-                                "public_ip": instance.get("PublicIpAddress"),
-                                "subnet_id": instance.get("SubnetId"),
-                                "vpc_id": instance.get("VpcId"),
-                                "state": instance["State"]["Name"],
-                                "region": region,
-                                "name": self._get_tag_value(instance.get("Tags", []), "Name"),
-                                "security_groups": [sg["GroupId"] for sg in instance.get("SecurityGroups", [])],
-                                "tags": self._process_tags(instance.get("Tags", []))
-                            }
-                            all_instances.append(instance_info)
+                for page in self._iter_pages(
+                    ec2_client.describe_instances, Filters=filters, MaxResults=_EC2_MAX_RESULTS
+                ):
+                    for reservation in page["Reservations"]:
+                        for instance in reservation["Instances"]:
+                            if instance["State"]["Name"] == "running":
+                                tags = self._process_tags(instance.get("Tags", []))
+                                instance_info = {
+                                    "instance_id": instance["InstanceId"],
+                                    "instance_type": instance["InstanceType"],
+                                    "private_ip": instance.get("PrivateIpAddress"),
+                                    "public_ip": instance.get("PublicIpAddress"),
+                                    "subnet_id": instance.get("SubnetId"),
+                                    "vpc_id": instance.get("VpcId"),
+                                    "state": instance["State"]["Name"],
+                                    "region": region,
+                                    "name": tags.get("Name"),
+                                    "security_groups": [sg["GroupId"] for sg in instance.get("SecurityGroups", [])],
+                                    "tags": tags
+                                }
+                                all_instances.append(instance_info)
             except ClientError as e:
                 logger.error(f"Error discovering EC2 instances in region {region}: {e}")
         return all_instances
@@ -127,33 +166,64 @@ class AWSResourceDiscovery:
     def discover_load_balancers(self, vpc_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Discover load balancers across all regions."""
         all_load_balancers = []
-        for region in self.regions:
-            try:
-                elbv2_client = self.regional_clients[region]['elbv2']
-                response = elbv2_client.describe_load_balancers()
-                
-                for lb in response["LoadBalancers"]:
-                    if vpc_id and lb["VpcId"] != vpc_id:
-                        continue
+        
+        # Listener lookups are queued as each page arrives, and each region's target
+        # groups are listed in one batch, so they overlap with listing the remaining
+        # pages and regions instead of running after them
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending_listeners = []
+            pending_target_groups = []
+            for region in self.regions:
+                region_load_balancers = {}
+                try:
+                    elbv2_client = self.regional_clients[region]['elbv2']
+                    pages = self._iter_pages(
+                        elbv2_client.describe_load_balancers, tokens=_MARKER_TOKENS, PageSize=_ELBV2_PAGE_SIZE
+                    )
                     
-                    lb_arn = lb["LoadBalancerArn"]
-                    lb_info = {
-                        "name": lb["LoadBalancerName"],
-                        "arn": lb_arn,
-                        "type": lb["Type"],
-                        "scheme": lb["Scheme"],
-                        "state": lb["State"]["Code"],
-                        "vpc_id": lb["VpcId"],
-                        "region": region,
-                        "dns_name": lb["DNSName"],
-                        "ips": self._get_load_balancer_ips(lb),
-                        "target_groups": self._get_target_groups(lb_arn, region),
-                        "listeners": self._get_listeners(lb_arn, region),
-                        "subnets": [az["SubnetId"] for az in lb.get("AvailabilityZones", [])]
-                    }
-                    all_load_balancers.append(lb_info)
-            except ClientError as e:
-                logger.error(f"Error discovering load balancers in region {region}: {e}")
+                    for page in pages:
+                        for lb in page["LoadBalancers"]:
+                            if vpc_id and lb["VpcId"] != vpc_id:
+                                continue
+                            
+                            lb_arn = lb["LoadBalancerArn"]
+                            lb_info = {
+                                "name": lb["LoadBalancerName"],
+                                "arn": lb_arn,
+                                "type": lb["Type"],
+                                "scheme": lb["Scheme"],
+                                "state": lb["State"]["Code"],
+                                "vpc_id": lb["VpcId"],
+                                "region": region,
+                                "dns_name": lb["DNSName"],
+                                "ips": self._get_load_balancer_ips(lb),
+                                "target_groups": [],
+                                "listeners": [],
+                                "subnets": [az["SubnetId"] for az in lb.get("AvailabilityZones", [])]
+                            }
+                            pending_listeners.append(
+                                (lb_info, executor.submit(self._get_listeners, lb_arn, elbv2_client))
+                            )
+                            region_load_balancers[lb_arn] = lb_info
+                            all_load_balancers.append(lb_info)
+                except ClientError as e:
+                    logger.error(f"Error discovering load balancers in region {region}: {e}")
+                
+                if region_load_balancers:
+                    pending_target_groups.append((
+                        region_load_balancers,
+                        executor.submit(
+                            self._get_target_groups_by_load_balancer,
+                            set(region_load_balancers), elbv2_client
+                        )
+                    ))
+            
+            for lb_info, listeners in pending_listeners:
+                lb_info["listeners"] = listeners.result()
+            for region_load_balancers, target_groups in pending_target_groups:
+                target_groups_by_lb = target_groups.result()
+                for lb_arn, lb_info in region_load_balancers.items():
+                    lb_info["target_groups"] = target_groups_by_lb.get(lb_arn, [])
         return all_load_balancers
     
     def discover_rds_instances(self, vpc_id: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -162,30 +232,34 @@ class AWSResourceDiscovery:
         for region in self.regions:
             try:
                 rds_client = self.regional_clients[region]['rds']
-                response = rds_client.describe_db_instances()
+                pages = self._iter_pages(
+                    rds_client.describe_db_instances, tokens={"Marker": "Marker"}, MaxRecords=_RDS_MAX_RECORDS
+                )
                 
-                for db in response["DBInstances"]:
-                    db_subnet_group = db.get("DBSubnetGroup", {})
-                    db_vpc_id = db_subnet_group.get("VpcId")
-                    
-                    if vpc_id and db_vpc_id != vpc_id:
-                        continue
-                    
-                    rds_info = {
-                        "db_instance_id": db["DBInstanceIdentifier"],
-                        "engine": db["Engine"],
-                        "engine_version": db["EngineVersion"],
-                        "instance_class": db["DBInstanceClass"],
-                        "status": db["DBInstanceStatus"],
-                        "endpoint": db.get("Endpoint", {}).get("Address"),
-                        "port": db.get("Endpoint", {}).get("Port"),
-                        "vpc_id": db_vpc_id,
-                        "region": region,
-                        "subnet_group": db_subnet_group.get("DBSubnetGroupName"),
-                        "availability_zone": db.get("AvailabilityZone"),
-                        "security_groups": [sg["VpcSecurityGroupId"] for sg in db.get("VpcSecurityGroups", [])]
-                    }
-                    all_rds_instances.append(rds_info)
+                for page in pages:
+                    for db in page["DBInstances"]:
+                        db_subnet_group = db.get("DBSubnetGroup", {})
+                        db_vpc_id = db_subnet_group.get("VpcId")
+                        
+                        if vpc_id and db_vpc_id != vpc_id:
+                            continue
+                        
+                        endpoint = db.get("Endpoint") or {}
+                        rds_info = {
+                            "db_instance_id": db["DBInstanceIdentifier"],
+                            "engine": db["Engine"],
+                            "engine_version": db["EngineVersion"],
+                            "instance_class": db["DBInstanceClass"],
+                            "status": db["DBInstanceStatus"],
+                            "endpoint": endpoint.get("Address"),
+                            "port": endpoint.get("Port"),
+                            "vpc_id": db_vpc_id,
+                            "region": region,
+                            "subnet_group": db_subnet_group.get("DBSubnetGroupName"),
+                            "availability_zone": db.get("AvailabilityZone"),
+                            "security_groups": [sg["VpcSecurityGroupId"] for sg in db.get("VpcSecurityGroups", [])]
+                        }
+                        all_rds_instances.append(rds_info)
             except ClientError as e:
                 logger.error(f"Error discovering RDS instances in region {region}: {e}")
         return all_rds_instances
@@ -232,18 +306,24 @@ class AWSResourceDiscovery:
     def discover_route53_zones(self) -> List[Dict[str, Any]]:
         """Discover Route53 hosted zones."""
         try:
-            response = self.route53.list_hosted_zones()
             zones = []
             
-            for zone in response["HostedZones"]:
-                zone_id = zone["Id"].split("/")[-1]
-                zone_info = {
-                    "zone_id": zone_id,
-                    "name": zone["Name"],
-                    "type": zone["Config"].get("PrivateZone", False) and "Private" or "Public",
-                    "records": self._get_route53_records(zone_id)
-                }
-                zones.append(zone_info)
+            for page in self._iter_pages(self.route53.list_hosted_zones, tokens=_MARKER_TOKENS):
+                for zone in page["HostedZones"]:
+                    zone_id = zone["Id"].rpartition("/")[2]
+                    zone_info = {
+                        "zone_id": zone_id,
+                        "name": zone["Name"],
+                        "type": zone["Config"].get("PrivateZone", False) and "Private" or "Public",
+                        "records": []
+                    }
+                    zones.append(zone_info)
+            
+            # Record sets are one round trip per zone, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                zone_records = executor.map(self._get_route53_records, [zone["zone_id"] for zone in zones])
+                for zone_info, records in zip(zones, zone_records):
+                    zone_info["records"] = records
             return zones
         except ClientError as e:
             logger.error(f"Error discovering Route53 zones: {e}")
@@ -255,34 +335,58 @@ class AWSResourceDiscovery:
         for region in self.regions:
             try:
                 acm_client = self.regional_clients[region]['acm']
-                response = acm_client.list_certificates()
                 
-                for cert in response["CertificateSummaryList"]:
-                    cert_info = {
-                        "arn": cert["CertificateArn"],
-                        "domain": cert["DomainName"],
-                        "status": cert.get("Status", "UNKNOWN"),
-                        "region": region
-                    }
-                    all_certificates.append(cert_info)
+                for page in self._iter_pages(acm_client.list_certificates, MaxItems=_ACM_MAX_ITEMS):
+                    for cert in page["CertificateSummaryList"]:
+                        cert_info = {
+                            "arn": cert["CertificateArn"],
+                            "domain": cert["DomainName"],
+                            "status": cert.get("Status", "UNKNOWN"),
+                            "region": region
+                        }
+                        all_certificates.append(cert_info)
             except ClientError as e:
                 logger.error(f"Error discovering ACM certificates in region {region}: {e}")
         return all_certificates
     
+    def _iter_pages(
+        self,
+        operation: Callable[..., Dict[str, Any]],
+        tokens: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield response pages of a paginated AWS API call as they arrive.
+        
+        ``tokens`` maps the pagination keys of a response to the request
+        parameters they are passed back as (``NextToken`` by default). The
+        next page is requested in the background while the caller processes
+        the current one.
+        """
+        if tokens is None:
+            tokens = _NEXT_TOKENS
+        
+        # The worker thread is only started once a second page is needed
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            response = operation(**kwargs)
+            while True:
+                next_params = {param: response[key] for key, param in tokens.items() if response.get(key)}
+                if not next_params:
+                    yield response
+                    return
+                for param in tokens.values():
+                    kwargs.pop(param, None)
+                kwargs.update(next_params)
+                
+                next_response = prefetcher.submit(operation, **kwargs)
+                yield response
+                response = next_response.result()
+    
     def _process_tags(self, tags: List[Dict]) -> Dict[str, str]:
         """Process AWS tags into a dictionary."""
         return {tag["Key"]: tag["Value"] for tag in tags}
     
-    def _get_tag_value(self, tags: List[Dict], key: str) -> Optional[str]:
-        """Get a specific tag value."""
-        for tag in tags:
-            if tag["Key"] == key:
-                return tag["Value"]
-        return None
-    
-    def _determine_subnet_tier(self, subnet: Dict) -> str:
-        """Determine subnet tier based on tags and routing."""
-        tags = self._process_tags(subnet.get("Tags", []))
+    def _determine_subnet_tier(self, tags: Dict[str, str]) -> str:
+        """Determine subnet tier from its processed tags."""
         name = tags.get("Name", "").lower()
         
         if "public" in name or "dmz" in name or "presentation" in name:
@@ -296,38 +400,59 @@ class AWSResourceDiscovery:
     
     def _get_load_balancer_ips(self, lb: Dict) -> List[str]:
         """Get IP addresses for a load balancer."""
-        ips = []
-        for az in lb.get("AvailabilityZones", []):
-            for addr in az.get("LoadBalancerAddresses", []):
-                if addr.get("PrivateIPv4Address"):
-                    ips.append(addr["PrivateIPv4Address"])
-        return ips
+        return [
+            addr["PrivateIPv4Address"]
+            for az in lb.get("AvailabilityZones", [])
+            for addr in az.get("LoadBalancerAddresses", [])
+            if addr.get("PrivateIPv4Address")
+        ]
     
-    def _get_target_groups(self, lb_arn: str, region: str) -> List[Dict[str, Any]]:
-        """Get target groups for a load balancer."""
+    def _get_target_groups_by_load_balancer(
+        self,
+        lb_arns: Set[str],
+        elbv2_client: Any
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Get target groups for a region's load balancers in one listing, keyed by load balancer ARN."""
+        target_groups_by_lb = {}
+        target_groups = []
+        
         try:
-            elbv2_client = self.regional_clients[region]['elbv2']
-            response = elbv2_client.describe_target_groups(LoadBalancerArn=lb_arn)
-            target_groups = []
-            
-            for tg in response["TargetGroups"]:
-                tg_arn = tg["TargetGroupArn"]
-                targets = self._get_targets(tg_arn, region)
-                target_groups.append({
-                    "name": tg["TargetGroupName"],
-                    "arn": tg_arn,
-                    "port": tg.get("Port"),
-                    "protocol": tg.get("Protocol"),
-                    "targets": targets
-                })
-            return target_groups
-        except ClientError:
-            return []
+            pages = self._iter_pages(
+                elbv2_client.describe_target_groups, tokens=_MARKER_TOKENS, PageSize=_ELBV2_PAGE_SIZE
+            )
+            for page in pages:
+                for tg in page["TargetGroups"]:
+                    # A target group can serve several load balancers; skip ones we did not discover
+                    tg_lb_arns = [arn for arn in tg.get("LoadBalancerArns", []) if arn in lb_arns]
+                    if not tg_lb_arns:
+                        continue
+                    
+                    tg_info = {
+                        "name": tg["TargetGroupName"],
+                        "arn": tg["TargetGroupArn"],
+                        "port": tg.get("Port"),
+                        "protocol": tg.get("Protocol"),
+                        "targets": []
+                    }
+                    target_groups.append(tg_info)
+                    for lb_arn in tg_lb_arns:
+                        target_groups_by_lb.setdefault(lb_arn, []).append(tg_info)
+        except ClientError as e:
+            # Keep the target groups from the pages listed before the failure
+            logger.error(f"Error listing target groups: {e}")
+        
+        # Target health is one round trip per target group, so fetch it concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tg_targets = executor.map(
+                lambda tg_info: self._get_targets(tg_info["arn"], elbv2_client), target_groups
+            )
+            for tg_info, targets in zip(target_groups, tg_targets):
+                tg_info["targets"] = targets
+        return target_groups_by_lb
     
-    def _get_targets(self, tg_arn: str, region: str) -> List[Dict[str, Any]]:
-        """Get targets for a target group."""
+    def _get_targets(self, tg_arn: str, elbv2_client: Any) -> List[Dict[str, Any]]:
+        """Get targets for a target group using its regional ELBv2 client."""
         try:
-            elbv2_client = self.regional_clients[region]['elbv2']
             response = elbv2_client.describe_target_health(TargetGroupArn=tg_arn)
             targets = []
             for target in response["TargetHealthDescriptions"]:
@@ -340,69 +465,68 @@ class AWSResourceDiscovery:
         except ClientError:
             return []
     
-    def _get_listeners(self, lb_arn: str, region: str) -> List[Dict[str, Any]]:
-        """Get listeners for a load balancer."""
+    def _get_listeners(self, lb_arn: str, elbv2_client: Any) -> List[Dict[str, Any]]:
+        """Get listeners for a load balancer using its regional ELBv2 client."""
         try:
-            elbv2_client = self.regional_clients[region]['elbv2']
-            response = elbv2_client.describe_listeners(LoadBalancerArn=lb_arn)
-            listeners = []
-            for listener in response["Listeners"]:
-                listener_info = {
+            pages = self._iter_pages(
+                elbv2_client.describe_listeners, tokens=_MARKER_TOKENS, LoadBalancerArn=lb_arn
+            )
+            return [
+                {
                     "port": listener["Port"],
                     "protocol": listener["Protocol"],
-                    "certificates": []
+                    "certificates": [cert["CertificateArn"] for cert in listener.get("Certificates", [])]
                 }
-                for cert in listener.get("Certificates", []):
-                    listener_info["certificates"].append(cert["CertificateArn"])
-                listeners.append(listener_info)
-            return listeners
+                for page in pages
+                for listener in page["Listeners"]
+            ]
         except ClientError:
             return []
     
     def _get_route53_records(self, zone_id: str) -> List[Dict[str, Any]]:
         """Get Route53 records for a hosted zone."""
         try:
-            response = self.route53.list_resource_record_sets(HostedZoneId=zone_id)
+            pages = self._iter_pages(
+                self.route53.list_resource_record_sets, tokens=_RECORD_SET_TOKENS, HostedZoneId=zone_id
+            )
             records = []
-            for record in response["ResourceRecordSets"]:
-                if record["Type"] in ["A", "AAAA", "CNAME"]:
-                    record_info = {
-                        "name": record["Name"],
-                        "type": record["Type"],
-                        "values": []
-                    }
-                    if "AliasTarget" in record:
-                        record_info["values"].append(record["AliasTarget"]["DNSName"])
+            for page in pages:
+                for record in page["ResourceRecordSets"]:
+                    record_type = record["Type"]
+                    if record_type not in _ROUTE53_RECORD_TYPES:
+                        continue
+                    
+                    alias_target = record.get("AliasTarget")
+                    if alias_target:
+                        values = [alias_target["DNSName"]]
                     else:
-                        for rr in record.get("ResourceRecords", []):
-                            record_info["values"].append(rr["Value"])
-                    records.append(record_info)
+                        values = [rr["Value"] for rr in record.get("ResourceRecords", [])]
+                    records.append({
+                        "name": record["Name"],
+                        "type": record_type,
+                        "values": values
+                    })
             return records
         except ClientError:
             return []
     
     def _process_sg_rule(self, rule: Dict, direction: str) -> Optional[Dict[str, Any]]:
         """Process a security group rule."""
-        processed = {
+        sources = [
+            {"type": "cidr", "value": ip_range["CidrIp"]}
+            for ip_range in rule.get("IpRanges", [])
+        ]
+        sources.extend(
+            {"type": "security_group", "value": sg["GroupId"]}
+            for sg in rule.get("UserIdGroupPairs", [])
+        )
+        
+        if not sources:
+            return None
+        return {
             "direction": direction,
             "protocol": rule.get("IpProtocol", "-1"),
             "from_port": rule.get("FromPort"),
             "to_port": rule.get("ToPort"),
-            "sources": []
-        }
-        
-        for ip_range in rule.get("IpRanges", []):
-            processed["sources"].append({
-                "type": "cidr",
-                "value": ip_range["CidrIp"]
-            })
-        
-        for sg in rule.get("UserIdGroupPairs", []):
-            processed["sources"].append({
-                "type": "security_group",
-                "value": sg["GroupId"]
-            })
-        
-        if processed["sources"]:
-            return processed
-        return None
\ No newline at end of file
+            "sources": sources
+        }
\ No newline at end of file
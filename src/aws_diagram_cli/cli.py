@@ -8,11 +8,58 @@ import argparse
 import json
 import os
 import sys
+from itertools import chain
 from pathlib import Path
 
 from .aws_discovery import AWSResourceDiscovery
 from .generators.mermaid import MermaidDiagramGenerator
-from .generators.diagrams import DiagramsGenerator
+
+
+# Option overrides applied by each --sg-preset
+_SG_PRESETS = {
+    # Clean architecture view
+    "clean": {
+        "sg_flows": "none",
+        "sg_detail": "minimal",
+        "lb_display": "none",
+    },
+    # Network design view
+    "network": {
+        "sg_flows": "tier-crossing",
+        "sg_direction": "north-south",
+        "sg_detail": "ports",
+        "lb_display": "connected-only",
+        "lb_detail": "ports",
+    },
+    # Security audit view
+    "security": {
+        "sg_flows": "inter-subnet",
+        "sg_detail": "full",
+        "sg_only_ingress": True,
+        "lb_display": "all",
+        "lb_detail": "full",
+    },
+    # Troubleshooting view
+    "debug": {
+        "sg_flows": "external-only",
+        "sg_detail": "full",
+        "sg_filter_ephemeral": True,
+        "lb_display": "connected-only",
+        "lb_detail": "full",
+    },
+}
+
+
+def collect_security_group_ids(resources, regions):
+    """Collect the security group IDs used by instances and RDS, grouped by region."""
+    sg_ids_by_region = {region: set() for region in regions}
+    for resource in chain(resources["instances"], resources["rds_instances"]):
+        region_sg_ids = sg_ids_by_region.get(resource.get("region"))
+        if region_sg_ids is not None:
+            region_sg_ids.update(resource.get("security_groups", []))
+    
+    # Convert sets to lists
+    return {region: list(sg_ids) for region, sg_ids in sg_ids_by_region.items()}
 
 
 def discover_resources(args):
@@ -45,19 +92,8 @@ def discover_resources(args):
     resources["subnets"] = discovery.discover_subnets(vpc_id=args.vpc_id)
     print(f"Found {len(resources['subnets'])} subnets")
     
-    # Get all security groups from instances, load balancers, and RDS, grouped by region
-    sg_ids_by_region = {region: set() for region in args.regions}
-    for instance in resources["instances"]:
-        region = instance.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(instance.get("security_groups", []))
-    for rds in resources["rds_instances"]:
-        region = rds.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(rds.get("security_groups", []))
-    
-    # Convert sets to lists
-    sg_ids_by_region = {region: list(sg_ids) for region, sg_ids in sg_ids_by_region.items()}
+    # Get security groups from resources, grouped by region
+    sg_ids_by_region = collect_security_group_ids(resources, args.regions)
     resources["security_groups"] = discovery.discover_security_groups(sg_ids_by_region)
     print(f"Found {len(resources['security_groups'])} security groups")
     
@@ -96,27 +132,13 @@ def generate_mermaid(args):
     }
     
     # Get security groups from resources, grouped by region
-    sg_ids_by_region = {region: set() for region in args.regions}
-    for instance in resources["instances"]:
-        region = instance.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(instance.get("security_groups", []))
-    for rds in resources["rds_instances"]:
-        region = rds.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(rds.get("security_groups", []))
-    
-    # Convert sets to lists
-    sg_ids_by_region = {region: list(sg_ids) for region, sg_ids in sg_ids_by_region.items()}
+    sg_ids_by_region = collect_security_group_ids(resources, args.regions)
     resources["security_groups"] = discovery.discover_security_groups(sg_ids_by_region)
     
     if args.include_route53:
         resources["route53_zones"] = discovery.discover_route53_zones()
     
-    if args.include_acm:
-        resources["certificates"] = discovery.discover_acm_certificates()
-    
-    # Generate diagram
+    # Generate diagram; certificates are not drawn, so ACM is only discovered by the discover command
     account_info = discovery.get_account_info()
     diagram = generator.generate_diagram(
         account_info=account_info,
@@ -145,43 +167,35 @@ def generate_mermaid(args):
 
 def generate_dot(args):
     """Generate DOT/Graphviz diagram."""
+    # Imported here so the discover and mermaid commands don't pay for loading diagrams
+    from .generators.diagrams import DiagramsGenerator
+    
     discovery = AWSResourceDiscovery(regions=args.regions, profile=args.profile)
     generator = DiagramsGenerator()
     
     regions_str = ", ".join(args.regions)
     print(f"Generating DOT diagram for {regions_str}...")
     
-    # Discover resources
+    # Discover resources; hidden load balancers are never drawn or linked, so
+    # skip their discovery and its per-load-balancer lookups entirely
     resources = {
         "instances": discovery.discover_ec2_instances(vpc_id=args.vpc_id),
-        "load_balancers": discovery.discover_load_balancers(vpc_id=args.vpc_id),
+        "load_balancers": (
+            discovery.discover_load_balancers(vpc_id=args.vpc_id) if args.lb_display != "none" else []
+        ),
         "rds_instances": discovery.discover_rds_instances(vpc_id=args.vpc_id),
         "subnets": discovery.discover_subnets(vpc_id=args.vpc_id),
         "vpcs": discovery.discover_vpcs() if not args.vpc_id else []
     }
     
     # Get security groups from resources, grouped by region
-    sg_ids_by_region = {region: set() for region in args.regions}
-    for instance in resources["instances"]:
-        region = instance.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(instance.get("security_groups", []))
-    for rds in resources["rds_instances"]:
-        region = rds.get("region")
-        if region in sg_ids_by_region:
-            sg_ids_by_region[region].update(rds.get("security_groups", []))
-    
-    # Convert sets to lists
-    sg_ids_by_region = {region: list(sg_ids) for region, sg_ids in sg_ids_by_region.items()}
+    sg_ids_by_region = collect_security_group_ids(resources, args.regions)
     resources["security_groups"] = discovery.discover_security_groups(sg_ids_by_region)
     
     if args.include_route53:
         resources["route53_zones"] = discovery.discover_route53_zones()
     
-    if args.include_acm:
-        resources["certificates"] = discovery.discover_acm_certificates()
-    
-    # Generate diagram
+    # Generate diagram; certificates are not drawn, so ACM is only discovered by the discover command
     account_info = discovery.get_account_info()
     output_path = args.output or "aws_infrastructure"
     
@@ -257,7 +271,7 @@ def main():
                          help="Hide high ephemeral ports (>32768)")
     sg_group.add_argument("--sg-only-ingress", action="store_true", 
                          help="Only show ingress rules (ignore egress)")
-    sg_group.add_argument("--sg-preset", choices=["clean", "network", "security", "debug"], 
+    sg_group.add_argument("--sg-preset", choices=list(_SG_PRESETS), 
                          help="Predefined security group display presets")
     
     # Load Balancer behavior flags
@@ -273,14 +287,17 @@ def main():
     
     # Discover command
     discover_parser = subparsers.add_parser("discover", help="Discover AWS resources")
+    discover_parser.set_defaults(handler=discover_resources)
     
     # Mermaid command
     mermaid_parser = subparsers.add_parser("mermaid", help="Generate Mermaid diagram")
+    mermaid_parser.set_defaults(handler=generate_mermaid)
     
     # DOT command  
     dot_parser = subparsers.add_parser("dot", help="Generate DOT/Graphviz diagram")
     dot_parser.add_argument("--format", choices=["png", "svg", "pdf", "dot"], default="png",
                            help="Output format (default: png)")
+    dot_parser.set_defaults(handler=generate_dot)
     
     args = parser.parse_args()
     
@@ -297,12 +314,7 @@ def main():
         sys.exit(1)
     
     try:
-        if args.command == "discover":
-            discover_resources(args)
-        elif args.command == "mermaid":
-            generate_mermaid(args)
-        elif args.command == "dot":
-            generate_dot(args)
+        args.handler(args)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
@@ -310,32 +322,8 @@ def main():
 
 def apply_sg_preset(args):
     """Apply predefined security group and load balancer presets."""
-    if args.sg_preset == "clean":
-        # Clean architecture view
-        args.sg_flows = "none"
-        args.sg_detail = "minimal"
-        args.lb_display = "none"
-    elif args.sg_preset == "network":
-        # Network design view
-        args.sg_flows = "tier-crossing"
-        args.sg_direction = "north-south"
-        args.sg_detail = "ports"
-        args.lb_display = "connected-only"
-        args.lb_detail = "ports"
-    elif args.sg_preset == "security":
-        # Security audit view
-        args.sg_flows = "inter-subnet"
-        args.sg_detail = "full"
-        args.sg_only_ingress = True
-        args.lb_display = "all"
-        args.lb_detail = "full"
-    elif args.sg_preset == "debug":
-        # Troubleshooting view
-        args.sg_flows = "external-only"
-        args.sg_detail = "full"
-        args.sg_filter_ephemeral = True
-        args.lb_display = "connected-only"
-        args.lb_detail = "full"
+    for option, value in _SG_PRESETS.get(args.sg_preset, {}).items():
+        setattr(args, option, value)
 
 
 if __name__ == "__main__":
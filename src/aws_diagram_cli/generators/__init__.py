@@ -1,6 +1,13 @@
 """Diagram generators for AWS infrastructure."""
 
 from .mermaid import MermaidDiagramGenerator
-from .diagrams import DiagramsGenerator
 
-__all__ = ["MermaidDiagramGenerator", "DiagramsGenerator"]
\ No newline at end of file
+__all__ = ["MermaidDiagramGenerator", "DiagramsGenerator"]
+
+
+def __getattr__(name):
+    # The diagrams library is slow to import, so only load it when the DOT generator is used
+    if name == "DiagramsGenerator":
+        from .diagrams import DiagramsGenerator
+        return DiagramsGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
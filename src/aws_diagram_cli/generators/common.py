@@ -0,0 +1,67 @@
+"""Helpers shared by the Mermaid and DOT diagram generators."""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+# Subnet tiers in the order they are drawn
+TIER_ORDER = ("presentation", "application", "restricted")
+
+# Display labels for subnet tiers
+TIER_LABELS = {
+    "presentation": "Public Subnet",
+    "application": "Application Subnet",
+    "restricted": "Restricted Subnet"
+}
+
+# IP protocol numbers used by security group rules
+PROTOCOL_NAMES = {"-1": "all", "6": "tcp", "17": "udp", "1": "icmp"}
+
+
+def vpc_region(vpc: Dict[str, Any]) -> str:
+    """Return the region a VPC belongs to."""
+    return vpc.get("region", "us-east-1")
+
+
+def group_by_vpc(resources: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group resources by VPC ID, preserving their order."""
+    resources_by_vpc = defaultdict(list)
+    for resource in resources:
+        resources_by_vpc[resource["vpc_id"]].append(resource)
+    return resources_by_vpc
+
+
+def normalize_protocol(protocol: str) -> str:
+    """Normalize protocol string."""
+    return PROTOCOL_NAMES.get(protocol) or protocol.lower()
+
+
+def index_load_balancer_nodes_by_dns(
+    load_balancers: List[Dict[str, Any]],
+    nodes: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Index rendered load balancer nodes by normalized DNS name."""
+    lb_nodes_by_dns = {}
+    for lb in load_balancers:
+        lb_node = nodes.get(lb["arn"])
+        if lb_node and lb.get("dns_name"):
+            lb_nodes_by_dns[lb["dns_name"].lower().rstrip(".")] = lb_node
+    return lb_nodes_by_dns
+
+
+def match_load_balancer_node(value: str, lb_nodes_by_dns: Dict[str, Any]) -> Optional[Any]:
+    """Find the load balancer node a Route53 record value points at.
+
+    Alias targets are the load balancer DNS name with an optional prefix
+    (e.g. ``dualstack.``) and trailing dot, so the value's DNS suffixes are
+    checked against the index from longest to shortest.
+    """
+    name = value.lower().rstrip(".")
+    start = 0
+    while True:
+        # Slice each suffix from the normalized name instead of re-joining labels
+        lb_node = lb_nodes_by_dns.get(name[start:])
+        if lb_node:
+            return lb_node
+        start = name.find(".", start) + 1
+        if not start:
+            return None
@@ -1,10 +1,12 @@
 """Python Diagrams generator for AWS infrastructure (DOT/Graphviz output)."""
 
+import json
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 from pathlib import Path
 import os
 from collections import defaultdict
+from itertools import groupby
 
 from diagrams import Diagram, Cluster, Edge
 from diagrams.aws.compute import EC2
@@ -13,8 +15,35 @@ from diagrams.aws.network import ELB, ALB, NLB, Route53
 from diagrams.aws.security import ACM
 from diagrams.aws.general import General
 
+from .common import (
+    TIER_LABELS,
+    TIER_ORDER,
+    group_by_vpc,
+    index_load_balancer_nodes_by_dns,
+    match_load_balancer_node,
+    normalize_protocol,
+    vpc_region,
+)
+
 logger = logging.getLogger(__name__)
 
+# Node classes by load balancer type as ELBv2 reports it (lowercase);
+# anything else renders as a classic ELB
+_LB_NODE_CLASSES = {"application": ALB, "network": NLB}
+
+# Tier hierarchy: presentation -> application -> restricted
+_TIER_HIERARCHY = {"presentation": 1, "application": 2, "restricted": 3}
+
+# Security group rule directions to analyze
+_INGRESS_RULE_TYPES = ("ingress",)
+_ALL_RULE_TYPES = ("ingress", "egress")
+
+# Common service names for connection labels
+_SERVICE_NAMES = {
+    80: "http", 443: "https", 22: "ssh", 3306: "mysql",
+    5432: "postgres", 6379: "redis", 27017: "mongodb"
+}
+
 
 class DiagramsGenerator:
     """Generates DOT/Graphviz diagrams using Python Diagrams from AWS resource data."""
@@ -72,26 +101,34 @@ class DiagramsGenerator:
             # Create Route53 nodes first (they go at the top)
             route53_nodes = self._create_route53_nodes(route53_zones)
             
-            # Group VPCs by region and process each region
-            vpcs_by_region = defaultdict(list)
-            for vpc in vpcs:
-                vpc_region = vpc.get("region", "us-east-1")
-                vpcs_by_region[vpc_region].append(vpc)
+            # Group resources by VPC once rather than rescanning them for every VPC
+            subnets_by_vpc = group_by_vpc(subnets)
+            instances_by_vpc = group_by_vpc(instances)
+            load_balancers_by_vpc = group_by_vpc(load_balancers)
+            rds_by_vpc = group_by_vpc(rds_instances)
+            
+            # Resolve load balancer options once; the target health predicate is
+            # shared by the display filter of every VPC and the connection pass
+            lb_options = lb_options or {}
+            target_filter = self._compile_target_filter(lb_options.get("filter_unhealthy", False))
+            lb_filter = self._compile_lb_display_filter(lb_options.get("display", "all"), target_filter)
             
-            # Process each region
-            for region in sorted(vpcs_by_region.keys()):
-                if vpcs_by_region[region]:
-                    with Cluster(f"Region: {region.upper()}"):
-                        for vpc in vpcs_by_region[region]:
-                            self._create_vpc_cluster(
-                                vpc, region, subnets, instances, load_balancers, rds_instances, 
-                                lb_options or {}
-                            )
+            # Group VPCs by region and process each region in sorted order
+            vpcs_by_region = groupby(sorted(vpcs, key=vpc_region), key=vpc_region)
+            for region, region_vpcs in vpcs_by_region:
+                with Cluster(f"Region: {region.upper()}"):
+                    for vpc in region_vpcs:
+                        vpc_id = vpc["vpc_id"]
+                        self._create_vpc_cluster(
+                            vpc, region, subnets_by_vpc.get(vpc_id, []), instances_by_vpc.get(vpc_id, []),
+                            load_balancers_by_vpc.get(vpc_id, []), rds_by_vpc.get(vpc_id, []),
+                            lb_filter
+                        )
             
             # Create connections after all nodes are created
             self._create_connections(
                 instances, load_balancers, rds_instances, security_groups, route53_zones, 
-                subnets, sg_options or {}, lb_options or {}
+                subnets, sg_options or {}, lb_options, target_filter
             )
         
         # The outformat parameter generates all files automatically
@@ -120,105 +157,96 @@ class DiagramsGenerator:
         self,
         vpc: Dict[str, Any],
         region: str,
-        subnets: List[Dict[str, Any]],
-        instances: List[Dict[str, Any]],
-        load_balancers: List[Dict[str, Any]],
-        rds_instances: List[Dict[str, Any]],
-        lb_options: Dict[str, Any]
+        vpc_subnets: List[Dict[str, Any]],
+        vpc_instances: List[Dict[str, Any]],
+        vpc_lbs: List[Dict[str, Any]],
+        vpc_rds: List[Dict[str, Any]],
+        lb_filter: Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], List[Dict[str, Any]]]
     ) -> None:
-        """Create VPC cluster with all its resources."""
+        """Create VPC cluster with the resources that belong to it."""
         vpc_id = vpc["vpc_id"]
         vpc_name = vpc["tags"].get("Name", vpc_id)
         
         with Cluster(f"VPC: {vpc_name}\n({vpc['cidr_block']})"):
             with Cluster(f"Region: {region}"):
                 
-                # Filter resources for this VPC
-                vpc_subnets = [s for s in subnets if s["vpc_id"] == vpc_id]
-                vpc_instances = [i for i in instances if i["vpc_id"] == vpc_id]
-                vpc_lbs = [lb for lb in load_balancers if lb["vpc_id"] == vpc_id]
-                vpc_rds = [rds for rds in rds_instances if rds["vpc_id"] == vpc_id]
-                
                 # Apply load balancer filtering
-                vpc_lbs = self._filter_load_balancers(vpc_lbs, vpc_instances, lb_options)
+                vpc_lbs = lb_filter(vpc_lbs, vpc_instances)
                 
                 # Organize resources by subnet
                 subnet_resources = self._organize_resources_by_subnet(
                     vpc_subnets, vpc_instances, vpc_lbs, vpc_rds
                 )
                 
-                # Create subnet clusters in tier order
-                tier_order = ["presentation", "application", "restricted"]
-                for tier in tier_order:
-                    tier_subnets = [s for s in vpc_subnets if s.get("tier") == tier]
-                    
-                    for subnet in tier_subnets:
+                # Create subnet clusters in tier order, bucketing subnets by tier in one pass
+                subnets_by_tier = defaultdict(list)
+                for subnet in vpc_subnets:
+                    subnets_by_tier[subnet.get("tier")].append(subnet)
+                
+                for tier in TIER_ORDER:
+                    tier_label = TIER_LABELS[tier]
+                    for subnet in subnets_by_tier.get(tier, []):
                         subnet_id = subnet["subnet_id"]
                         if subnet_id not in subnet_resources or not subnet_resources[subnet_id]:
                             continue
                         
-                        self._create_subnet_cluster(subnet, subnet_resources[subnet_id])
+                        self._create_subnet_cluster(subnet, subnet_resources[subnet_id], tier_label)
     
     def _create_subnet_cluster(
         self,
         subnet: Dict[str, Any],
-        resources: Dict[str, List[Dict[str, Any]]]
+        resources: Dict[str, List[Dict[str, Any]]],
+        tier_label: str
     ) -> None:
-        """Create subnet cluster with its resources."""
+        """Create subnet cluster with its resources under the given tier label."""
         subnet_id = subnet["subnet_id"]
         subnet_name = subnet["tags"].get("Name", subnet_id)
-        tier = subnet.get("tier", "unknown")
         
-        tier_labels = {
-            "presentation": "Public Subnet",
-            "application": "Application Subnet", 
-            "restricted": "Restricted Subnet"
-        }
-        label = f"{tier_labels.get(tier, 'Subnet')}\n{subnet_name}\n({subnet['cidr_block']})"
+        label = f"{tier_label}\n{subnet_name}\n({subnet['cidr_block']})"
         
         with Cluster(label):
             
-            # Create load balancer nodes
-            for lb in resources.get("load_balancers", []):
-                lb_type = lb["type"].upper()
-                lb_name = lb["name"]
-                ips = ", ".join(lb.get("ips", [])[:2])  # Limit to first 2 IPs for space
-                
-                if lb_type == "APPLICATION":
-                    node = ALB(f"{lb_name}\n{ips}" if ips else lb_name)
-                elif lb_type == "NETWORK":
-                    node = NLB(f"{lb_name}\n{ips}" if ips else lb_name)
-                else:
-                    node = ELB(f"{lb_name}\n{ips}" if ips else lb_name)
-                
-                self.nodes[lb["arn"]] = node
-            
-            # Create EC2 instance nodes
-            for instance in resources.get("instances", []):
-                name = instance.get("name", instance["instance_id"])
-                ip = instance.get("private_ip", "no-ip")
-                instance_type = instance.get("instance_type", "")
-                
-                label = f"{name}\n{ip}"
-                if instance_type:
-                    label += f"\n({instance_type})"
-                
-                node = EC2(label)
-                self.nodes[instance["instance_id"]] = node
-            
-            # Create RDS nodes
-            for rds in resources.get("rds", []):
-                db_id = rds["db_instance_id"]
-                engine = rds["engine"]
-                endpoint = rds.get("endpoint", "")
-                
-                label = f"{db_id}\n{engine}"
-                if endpoint:
-                    label += f"\n{endpoint}"
-                
-                node = RDS(label)
-                self.nodes[rds["db_instance_id"]] = node
-    
+            # Create load balancer, EC2 instance and RDS nodes
+            lb_label = self._get_lb_label
+            instance_label = self._get_instance_label
+            rds_label = self._get_rds_label
+            self.nodes.update(
+                (lb["arn"], _LB_NODE_CLASSES.get(lb["type"], ELB)(lb_label(lb)))
+                for lb in resources.get("load_balancers", [])
+            )
+            self.nodes.update(
+                (instance["instance_id"], EC2(instance_label(instance)))
+                for instance in resources.get("instances", [])
+            )
+            self.nodes.update(
+                (rds["db_instance_id"], RDS(rds_label(rds)))
+                for rds in resources.get("rds", [])
+            )
+
+    def _get_lb_label(self, lb: Dict[str, Any]) -> str:
+        """Build the node label for a load balancer."""
+        ips = lb.get("ips")
+        if not ips:
+            return lb["name"]
+        # Limit to first 2 IPs for space, copying only when there are more
+        return f"{lb['name']}\n{', '.join(ips[:2] if len(ips) > 2 else ips)}"
+
+    def _get_instance_label(self, instance: Dict[str, Any]) -> str:
+        """Build the node label for an EC2 instance."""
+        name = instance.get("name", instance["instance_id"])
+        ip = instance.get("private_ip", "no-ip")
+        instance_type = instance.get("instance_type", "")
+
+        return f"{name}\n{ip}\n({instance_type})" if instance_type else f"{name}\n{ip}"
+
+    def _get_rds_label(self, rds: Dict[str, Any]) -> str:
+        """Build the node label for an RDS instance."""
+        db_instance_id = rds["db_instance_id"]
+        engine = rds["engine"]
+        endpoint = rds.get("endpoint")
+
+        return f"{db_instance_id}\n{engine}\n{endpoint}" if endpoint else f"{db_instance_id}\n{engine}"
+
     def _create_connections(
         self,
         instances: List[Dict[str, Any]],
@@ -228,27 +256,17 @@ class DiagramsGenerator:
         route53_zones: List[Dict[str, Any]],
         subnets: List[Dict[str, Any]],
         sg_options: Dict[str, Any],
-        lb_options: Dict[str, Any]
+        lb_options: Dict[str, Any],
+        target_filter: Callable[[Dict[str, Any]], bool]
     ) -> None:
-        """Create all connections between nodes."""
+        """Create all connections between nodes, drawing only targets that pass the filter."""
         
         # Route53 to Load Balancer connections
-        for zone in route53_zones:
-            zone_node = self.nodes.get(zone["zone_id"])
-            if not zone_node:
-                continue
-            
-            for record in zone.get("records", []):
-                for value in record.get("values", []):
-                    for lb in load_balancers:
-                        if lb["dns_name"] in value:
-                            lb_node = self.nodes.get(lb["arn"])
-                            if lb_node:
-                                zone_node >> Edge(label="53/tcp") >> lb_node
+        if route53_zones and load_balancers:
+            self._create_route53_connections(route53_zones, load_balancers)
         
         # Load Balancer to Target connections (only for load balancers that exist in nodes)
-        lb_detail = lb_options.get("detail", "ports")
-        filter_unhealthy = lb_options.get("filter_unhealthy", False)
+        lb_connection_label = self._compile_lb_connection_label(lb_options.get("detail", "ports"))
         
         for lb in load_balancers:
             lb_node = self.nodes.get(lb["arn"])
@@ -257,19 +275,13 @@ class DiagramsGenerator:
             
             for tg in lb.get("target_groups", []):
                 # Generate label for this target group
-                label = self._get_lb_connection_label(tg, lb_detail)
+                label = lb_connection_label(tg)
                 
                 for target in tg.get("targets", []):
                     target_id = target["id"]
                     target_node = self.nodes.get(target_id)
                     
-                    if target_node:
-                        # Apply health filtering if enabled
-                        if filter_unhealthy:
-                            target_health = target.get("health", "healthy")
-                            if target_health != "healthy":
-                                continue
-                        
+                    if target_node and target_filter(target):
                         if label:
                             lb_node >> Edge(label=label) >> target_node
                         else:
@@ -285,12 +297,36 @@ class DiagramsGenerator:
             to_node = self.nodes.get(conn["to"])
             
             if from_node and to_node:
-                label = conn.get("label", "")
+                label = conn["label"]
                 if label:
                     from_node >> Edge(label=label) >> to_node
                 else:
                     from_node >> to_node
     
+    def _create_route53_connections(
+        self,
+        route53_zones: List[Dict[str, Any]],
+        load_balancers: List[Dict[str, Any]]
+    ) -> None:
+        """Connect Route53 zones to the load balancers their records point at."""
+        lb_nodes_by_dns = index_load_balancer_nodes_by_dns(load_balancers, self.nodes)
+        if not lb_nodes_by_dns:
+            return
+        
+        for zone in route53_zones:
+            zone_node = self.nodes.get(zone["zone_id"])
+            if not zone_node:
+                continue
+            
+            # A/AAAA alias pairs point at the same load balancer; link it once
+            linked_lb_nodes = set()
+            for record in zone.get("records", []):
+                for value in record.get("values", []):
+                    lb_node = match_load_balancer_node(value, lb_nodes_by_dns)
+                    if lb_node and lb_node not in linked_lb_nodes:
+                        linked_lb_nodes.add(lb_node)
+                        zone_node >> Edge(label="53/tcp") >> lb_node
+    
     def _organize_resources_by_subnet(
         self,
         subnets: List[Dict[str, Any]],
@@ -314,73 +350,57 @@ class DiagramsGenerator:
             for subnet_id in lb.get("subnets", []):
                 subnet_resources[subnet_id]["load_balancers"].append(lb)
         
-        # RDS instances are typically in subnet groups spanning multiple subnets
-        for rds in rds_instances:
-            if rds.get("subnet_group"):
-                # Add RDS to restricted tier subnets
-                for subnet in subnets:
-                    if subnet.get("tier") == "restricted":
-                        subnet_resources[subnet["subnet_id"]]["rds"].append(rds)
-                        break
+        # RDS instances are typically in subnet groups spanning multiple subnets,
+        # so draw them in the first restricted tier subnet
+        grouped_rds = [rds for rds in rds_instances if rds.get("subnet_group")]
+        if grouped_rds:
+            restricted_subnet_id = next(
+                (subnet["subnet_id"] for subnet in subnets if subnet.get("tier") == "restricted"), None
+            )
+            if restricted_subnet_id:
+                subnet_resources[restricted_subnet_id]["rds"].extend(grouped_rds)
         
         return subnet_resources
     
-    def _filter_load_balancers(
+    def _compile_lb_display_filter(
         self,
-        load_balancers: List[Dict[str, Any]],
-        instances: List[Dict[str, Any]],
-        lb_options: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Filter load balancers based on display options."""
-        display_mode = lb_options.get("display", "all")
-        
-        if display_mode == "none":
-            return []
-        elif display_mode == "all":
-            return load_balancers
-        elif display_mode == "connected-only":
-            return self._get_connected_load_balancers(load_balancers, instances, lb_options)
-        
-        return load_balancers
+        display: str,
+        target_filter: Callable[[Dict[str, Any]], bool]
+    ) -> Callable[[List[Dict[str, Any]], List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Compile the display mode into a filter over a VPC's load balancers and instances."""
+        if display == "none":
+            return lambda load_balancers, instances: []
+        if display == "connected-only":
+            return lambda load_balancers, instances: self._get_connected_load_balancers(
+                load_balancers, instances, target_filter
+            )
+        return lambda load_balancers, instances: load_balancers
     
     def _get_connected_load_balancers(
         self,
         load_balancers: List[Dict[str, Any]],
         instances: List[Dict[str, Any]],
-        lb_options: Dict[str, Any]
+        target_filter: Callable[[Dict[str, Any]], bool]
     ) -> List[Dict[str, Any]]:
         """Get load balancers that have valid downstream connections."""
-        connected_lbs = []
-        filter_unhealthy = lb_options.get("filter_unhealthy", False)
-        
         # Create set of instance IDs for quick lookup
         instance_ids = {inst["instance_id"] for inst in instances}
         
-        for lb in load_balancers:
-            has_connections = False
-            
-            for tg in lb.get("target_groups", []):
-                for target in tg.get("targets", []):
-                    target_id = target["id"]
-                    
-                    # Check if target exists in our instance list
-                    if target_id in instance_ids:
-                        # If filtering unhealthy, check target health
-                        if filter_unhealthy:
-                            target_health = target.get("health", "healthy")
-                            if target_health != "healthy":
-                                continue
-                        
-                        has_connections = True
-                        break
-                
-                if has_connections:
-                    break
-            
-            if has_connections:
-                connected_lbs.append(lb)
+        def has_connections(lb: Dict[str, Any]) -> bool:
+            # A target counts if it is one of our instances and passes health filtering
+            return any(
+                target["id"] in instance_ids and target_filter(target)
+                for tg in lb.get("target_groups", [])
+                for target in tg.get("targets", [])
+            )
         
-        return connected_lbs
+        return [lb for lb in load_balancers if has_connections(lb)]
+    
+    def _compile_target_filter(self, filter_unhealthy: bool) -> Callable[[Dict[str, Any]], bool]:
+        """Compile the target health option into a predicate over targets."""
+        if filter_unhealthy:
+            return lambda target: target.get("health", "healthy") == "healthy"
+        return lambda target: True
     
     def _analyze_security_group_connections(
         self,
@@ -398,134 +418,163 @@ class DiagramsGenerator:
         if flows == "none":
             return connections
         
-        # Get filtering options
-        direction_filter = sg_options.get("direction", "both")
-        detail_level = sg_options.get("detail", "ports")
-        filter_internal = sg_options.get("filter_internal", False)
+        # Compile filtering options into predicates once
+        connection_label = self._compile_connection_label(sg_options.get("detail", "ports"))
         only_ingress = sg_options.get("only_ingress", False)
+        port_filter = self._compile_port_filter(sg_options)
         
         # Create mappings
         instance_map = {inst["instance_id"]: inst for inst in instances}
+        subnet_tiers = {subnet["subnet_id"]: subnet.get("tier", "unknown") for subnet in subnets}
+        classify_pair = self._compile_pair_classifier(
+            self._compile_flow_filter(flows, sg_options.get("filter_internal", False)),
+            self._compile_direction_filter(sg_options.get("direction", "both")),
+            subnet_tiers
+        )
         
         # Map security groups to resources
-        instance_sg_map = {}
-        rds_sg_map = {}
+        instance_sg_map = defaultdict(list)
+        rds_sg_map = defaultdict(list)
         
         for instance in instances:
+            instance_id = instance["instance_id"]
             for sg_id in instance.get("security_groups", []):
-                if sg_id not in instance_sg_map:
-                    instance_sg_map[sg_id] = []
-                instance_sg_map[sg_id].append(instance["instance_id"])
+                instance_sg_map[sg_id].append(instance_id)
         
         for rds in rds_instances:
+            db_instance_id = rds["db_instance_id"]
             for sg_id in rds.get("security_groups", []):
-                if sg_id not in rds_sg_map:
-                    rds_sg_map[sg_id] = []
-                rds_sg_map[sg_id].append(rds["db_instance_id"])
+                rds_sg_map[sg_id].append(db_instance_id)
         
         # Process rules (ingress only if specified)
-        rule_types = ["ingress"] if only_ingress else ["ingress", "egress"]
+        rule_types = _INGRESS_RULE_TYPES if only_ingress else _ALL_RULE_TYPES
         
         for sg_id, sg_info in security_groups.items():
+            to_instances = instance_sg_map.get(sg_id, [])
+            to_rds = rds_sg_map.get(sg_id, [])
+            
+            # Rules of a group with no drawn members cannot produce connections
+            if not to_instances and not to_rds:
+                continue
+            
+            rules = sg_info.get("rules", {})
             for rule_type in rule_types:
-                for rule in sg_info.get("rules", {}).get(rule_type, []):
-                    # Apply port filtering
-                    if not self._filter_by_port_rules(rule, sg_options):
+                for rule in rules.get(rule_type, []):
+                    source_sgs = [
+                        source["value"] for source in rule["sources"]
+                        if source["type"] == "security_group"
+                    ]
+                    
+                    # Skip rules without security group sources and apply port filtering
+                    if not source_sgs or not port_filter(rule):
                         continue
                     
-                    for source in rule.get("sources", []):
-                        if source["type"] == "security_group":
-                            source_sg = source["value"]
-                            
-                            from_instances = instance_sg_map.get(source_sg, [])
-                            to_instances = instance_sg_map.get(sg_id, [])
-                            to_rds = rds_sg_map.get(sg_id, [])
-                            
-                            # Generate label
-                            label = self._generate_connection_label(rule, detail_level)
+                    # The label depends only on the rule, so build it once for all sources
+                    label = connection_label(rule)
+                    
+                    for source_sg in source_sgs:
+                        from_instances = instance_sg_map.get(source_sg, [])
+                        
+                        # Process instance-to-instance connections
+                        for from_id in from_instances:
+                            from_instance = instance_map.get(from_id)
+                            if not from_instance:
+                                continue
                             
-                            # Process instance-to-instance connections
-                            for from_id in from_instances:
-                                from_instance = instance_map.get(from_id)
-                                if not from_instance:
+                            for to_id in to_instances:
+                                if from_id == to_id:
                                     continue
                                 
-                                for to_id in to_instances:
-                                    if from_id == to_id:
-                                        continue
-                                    
-                                    to_instance = instance_map.get(to_id)
-                                    if not to_instance:
-                                        continue
-                                    
-                                    # Apply flow filtering
-                                    flow_type = self._classify_connection_flow(
-                                        from_instance, to_instance, subnets, []
-                                    )
-                                    
-                                    if not self._should_show_flow(flow_type, flows, filter_internal):
-                                        continue
-                                    
-                                    # Apply direction filtering
-                                    traffic_direction = self._get_traffic_direction(
-                                        from_instance, to_instance, subnets
-                                    )
-                                    
-                                    if not self._should_show_direction(traffic_direction, direction_filter):
-                                        continue
-                                    
-                                    connections.append({
-                                        "from": from_id,
-                                        "to": to_id,
-                                        "label": label,
-                                        "type": "instance",
-                                        "flow_type": flow_type,
-                                        "direction": traffic_direction
-                                    })
+                                to_instance = instance_map.get(to_id)
+                                if not to_instance:
+                                    continue
+                                
+                                # Apply flow and direction filtering
+                                classification = classify_pair(from_instance, to_instance)
+                                if classification is None:
+                                    continue
                                 
-                                # Process instance-to-database connections (always show unless flows=none)
-                                for to_id in to_rds:
-                                    connections.append({
-                                        "from": from_id,
-                                        "to": to_id,
-                                        "label": label,
-                                        "type": "database",
-                                        "flow_type": "database",
-                                        "direction": "north-south"
-                                    })
+                                flow_type, traffic_direction = classification
+                                connections.append({
+                                    "from": from_id,
+                                    "to": to_id,
+                                    "label": label,
+                                    "type": "instance",
+                                    "flow_type": flow_type,
+                                    "direction": traffic_direction
+                                })
+                            
+                            # Process instance-to-database connections (always show unless flows=none)
+                            for to_id in to_rds:
+                                connections.append({
+                                    "from": from_id,
+                                    "to": to_id,
+                                    "label": label,
+                                    "type": "database",
+                                    "flow_type": "database",
+                                    "direction": "north-south"
+                                })
         
         return connections
     
-    def _should_show_flow(self, flow_type: str, flows_filter: str, filter_internal: bool) -> bool:
-        """Determine if a flow should be shown based on flow type filters."""
-        if filter_internal and flow_type == "intra-subnet":
-            return False
-        
+    def _compile_flow_filter(self, flows_filter: str, filter_internal: bool) -> Callable[[str], bool]:
+        """Compile flow type filters into a predicate over flow types."""
         if flows_filter == "inter-subnet":
-            return flow_type in ["inter-subnet", "tier-crossing"]
+            return frozenset(["inter-subnet", "tier-crossing"]).__contains__
         elif flows_filter == "tier-crossing":
-            return flow_type == "tier-crossing"
+            return frozenset(["tier-crossing"]).__contains__
         elif flows_filter == "external-only":
-            return flow_type == "external-only"
+            return frozenset(["external-only"]).__contains__
         
-        return True
+        if filter_internal:
+            return lambda flow_type: flow_type != "intra-subnet"
+        return lambda flow_type: True
     
-    def _should_show_direction(self, traffic_direction: str, direction_filter: str) -> bool:
-        """Determine if a connection should be shown based on direction filter."""
-        if direction_filter == "both":
-            return True
-        elif direction_filter == "north-south":
-            return traffic_direction == "north-south"
-        elif direction_filter == "east-west":
-            return traffic_direction == "east-west"
+    def _compile_direction_filter(self, direction_filter: str) -> Callable[[str], bool]:
+        """Compile the direction filter into a predicate over traffic directions."""
+        if direction_filter in ("north-south", "east-west"):
+            return lambda traffic_direction: traffic_direction == direction_filter
+        
+        return lambda traffic_direction: True
+    
+    def _compile_pair_classifier(
+        self,
+        flow_filter: Callable[[str], bool],
+        direction_filter: Callable[[str], bool],
+        subnet_tiers: Dict[str, str]
+    ) -> Callable[[Dict[str, Any], Dict[str, Any]], Optional[Tuple[str, str]]]:
+        """Compile flow and direction filtering into a single classifier over instance pairs.
+        
+        The classifier returns the pair's flow type and traffic direction, or
+        ``None`` when either filter rejects it. Both depend only on the two
+        instances' subnets, so results are cached per subnet pair.
+        """
+        classify_flow = self._classify_connection_flow
+        get_direction = self._get_traffic_direction
+        classifications = {}
+        
+        def classify_pair(from_instance: Dict[str, Any], to_instance: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+            subnet_pair = (from_instance.get("subnet_id"), to_instance.get("subnet_id"))
+            if subnet_pair in classifications:
+                return classifications[subnet_pair]
+            
+            classification = None
+            flow_type = classify_flow(from_instance, to_instance, subnet_tiers, [])
+            if flow_filter(flow_type):
+                traffic_direction = get_direction(from_instance, to_instance, subnet_tiers)
+                if direction_filter(traffic_direction):
+                    classification = (flow_type, traffic_direction)
+            
+            classifications[subnet_pair] = classification
+            return classification
         
-        return True
+        return classify_pair
     
     def _classify_connection_flow(
         self,
         from_instance: Dict[str, Any],
         to_instance: Dict[str, Any],
-        subnets: List[Dict[str, Any]],
+        subnet_tiers: Dict[str, str],
         load_balancers: List[Dict[str, Any]]
     ) -> str:
         """Classify the type of connection flow."""
@@ -533,20 +582,17 @@ class DiagramsGenerator:
         to_subnet_id = to_instance.get("subnet_id")
         
         # Find subnet tiers
-        from_tier = None
-        to_tier = None
-        for subnet in subnets:
-            if subnet["subnet_id"] == from_subnet_id:
-                from_tier = subnet.get("tier", "unknown")
-            elif subnet["subnet_id"] == to_subnet_id:
-                to_tier = subnet.get("tier", "unknown")
+        from_tier = subnet_tiers.get(from_subnet_id)
+        to_tier = subnet_tiers.get(to_subnet_id)
         
         # Check if either instance is behind a load balancer (external traffic)
-        for lb in load_balancers:
-            for tg in lb.get("target_groups", []):
-                for target in tg.get("targets", []):
-                    if target["id"] in [from_instance.get("instance_id"), to_instance.get("instance_id")]:
-                        return "external-only"
+        if load_balancers:
+            instance_ids = frozenset([from_instance.get("instance_id"), to_instance.get("instance_id")])
+            for lb in load_balancers:
+                for tg in lb.get("target_groups", []):
+                    for target in tg.get("targets", []):
+                        if target["id"] in instance_ids:
+                            return "external-only"
         
         # Determine flow type
         if from_subnet_id == to_subnet_id:
@@ -560,28 +606,14 @@ class DiagramsGenerator:
         self,
         from_instance: Dict[str, Any],
         to_instance: Dict[str, Any],
-        subnets: List[Dict[str, Any]]
+        subnet_tiers: Dict[str, str]
     ) -> str:
         """Determine traffic direction (north-south vs east-west)."""
-        from_subnet_id = from_instance.get("subnet_id")
-        to_subnet_id = to_instance.get("subnet_id")
+        # Find subnet tier levels; unknown tiers have no level
+        from_level = _TIER_HIERARCHY.get(subnet_tiers.get(from_instance.get("subnet_id")))
+        to_level = _TIER_HIERARCHY.get(subnet_tiers.get(to_instance.get("subnet_id")))
         
-        # Find subnet tiers
-        from_tier = None
-        to_tier = None
-        for subnet in subnets:
-            if subnet["subnet_id"] == from_subnet_id:
-                from_tier = subnet.get("tier", "unknown")
-            elif subnet["subnet_id"] == to_subnet_id:
-                to_tier = subnet.get("tier", "unknown")
-        
-        # Define tier hierarchy: presentation -> application -> restricted
-        tier_hierarchy = {"presentation": 1, "application": 2, "restricted": 3}
-        
-        if from_tier and to_tier and from_tier in tier_hierarchy and to_tier in tier_hierarchy:
-            from_level = tier_hierarchy[from_tier]
-            to_level = tier_hierarchy[to_tier]
-            
+        if from_level and to_level:
             if from_level != to_level:
                 return "north-south"  # Up or down the stack
             else:
@@ -589,9 +621,12 @@ class DiagramsGenerator:
         
         return "both"  # Unknown or mixed
     
-    def _filter_by_port_rules(self, rule: Dict[str, Any], sg_options: Dict[str, Any]) -> bool:
-        """Filter connections based on port and protocol rules."""
-        if sg_options.get("filter_ephemeral", False):
+    def _compile_port_filter(self, sg_options: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+        """Compile port and protocol filter options into a predicate over rules."""
+        if not sg_options.get("filter_ephemeral", False):
+            return lambda rule: True
+        
+        def port_filter(rule: Dict[str, Any]) -> bool:
             from_port = rule.get("from_port")
             to_port = rule.get("to_port")
             
@@ -600,78 +635,51 @@ class DiagramsGenerator:
                 return False
             if to_port and to_port > 32768:
                 return False
+            return True
         
-        return True
+        return port_filter
     
-    def _generate_connection_label(
-        self,
-        rule: Dict[str, Any],
-        detail_level: str
-    ) -> str:
-        """Generate connection labels based on detail level."""
-        if detail_level == "minimal":
-            return ""
-        
-        port = rule.get("to_port", rule.get("from_port", ""))
-        protocol = self._normalize_protocol(rule.get("protocol", "tcp"))
-        
-        if detail_level == "ports":
+    def _compile_connection_label(self, detail_level: str) -> Callable[[Dict[str, Any]], str]:
+        """Compile the connection label detail level into a function over rules."""
+        def rule_port_protocol(rule: Dict[str, Any]) -> Tuple[Any, str]:
+            port = rule.get("to_port", rule.get("from_port", ""))
+            return port, normalize_protocol(rule.get("protocol", "tcp"))
+        
+        def ports_label(rule: Dict[str, Any]) -> str:
+            port, protocol = rule_port_protocol(rule)
             return str(port) if port else protocol
-        elif detail_level == "protocols":
+        
+        def protocols_label(rule: Dict[str, Any]) -> str:
+            port, protocol = rule_port_protocol(rule)
             if port:
-                # Add common service names
-                service_names = {
-                    80: "http", 443: "https", 22: "ssh", 3306: "mysql",
-                    5432: "postgres", 6379: "redis", 27017: "mongodb"
-                }
-                service = service_names.get(port, f"{port}")
-                return f"{service}/{protocol}"
+                return f"{_SERVICE_NAMES.get(port, port)}/{protocol}"
             return protocol
-        elif detail_level == "full":
-            label = f"{port}/{protocol}" if port else protocol
+        
+        def full_label(rule: Dict[str, Any]) -> str:
             # Could add source SG info here in future
-            return label
+            port, protocol = rule_port_protocol(rule)
+            return f"{port}/{protocol}" if port else protocol
         
-        return ""
+        labels = {"ports": ports_label, "protocols": protocols_label, "full": full_label}
+        return labels.get(detail_level, lambda rule: "")
     
-    def _get_lb_connection_label(
-        self,
-        target_group: Dict[str, Any],
-        detail_level: str
-    ) -> str:
-        """Generate load balancer connection labels based on detail level."""
-        if detail_level == "minimal":
-            return ""
+    def _compile_lb_connection_label(self, detail_level: str) -> Callable[[Dict[str, Any]], str]:
+        """Compile the load balancer label detail level into a function over target groups."""
+        def ports_label(target_group: Dict[str, Any]) -> str:
+            return str(target_group.get("port", 443))
         
-        port = target_group.get("port", 443)
-        protocol = target_group.get("protocol", "tcp").lower()
+        def protocols_label(target_group: Dict[str, Any]) -> str:
+            return f"{target_group.get('port', 443)}/{target_group.get('protocol', 'tcp').lower()}"
         
-        if detail_level == "ports":
-            return str(port)
-        elif detail_level == "full":
+        def full_label(target_group: Dict[str, Any]) -> str:
+            label = protocols_label(target_group)
             health_check = target_group.get("health_check", {})
             hc_port = health_check.get("port", "")
             hc_path = health_check.get("path", "")
-            
-            label = f"{port}/{protocol}"
-            if hc_port and hc_path:
-                label += f" (hc:{hc_port}{hc_path})"
-            
-            return label
+            return f"{label} (hc:{hc_port}{hc_path})" if hc_port and hc_path else label
         
-        return f"{port}/{protocol}"
-    
-    def _normalize_protocol(self, protocol: str) -> str:
-        """Normalize protocol string."""
-        if protocol == "-1":
-            return "all"
-        elif protocol == "6":
-            return "tcp"
-        elif protocol == "17":
-            return "udp"
-        elif protocol == "1":
-            return "icmp"
-        return protocol.lower()
+        labels = {"minimal": lambda target_group: "", "ports": ports_label, "full": full_label}
+        return labels.get(detail_level, protocols_label)
     
     def save_diagram_metadata(self, files: Dict[str, str], output_path: str) -> None:
         """Save metadata about the generated diagram files."""
@@ -684,7 +692,6 @@ class DiagramsGenerator:
         
         metadata_path = Path(output_path).parent / f"{Path(output_path).stem}_metadata.json"
         
-        import json
         with open(metadata_path, "w") as f:
             json.dump(metadata, f, indent=2)
         
@@ -3,9 +3,23 @@
 import logging
 from typing import Dict, List, Any, Optional, Set, Tuple
 from collections import defaultdict
+from itertools import groupby
+
+from .common import (
+    TIER_LABELS,
+    TIER_ORDER,
+    group_by_vpc,
+    index_load_balancer_nodes_by_dns,
+    match_load_balancer_node,
+    normalize_protocol,
+    vpc_region,
+)
 
 logger = logging.getLogger(__name__)
 
+# Arrows for security group connections by type; other types draw solid arrows
+_SG_EDGE_ARROWS = {"database": "-.->"}
+
 
 class MermaidDiagramGenerator:
     """Generates Mermaid diagrams from AWS resource data."""
@@ -38,28 +52,26 @@ class MermaidDiagramGenerator:
         diagram_lines = ["graph TD"]
         
         account_id = account_info.get("account_id", "unknown")
-        account_name = f"Account: {account_id}"
-        
-        diagram_lines.append(f'    subgraph Account["{account_name}"]')
-        
-        # Group VPCs by region
-        vpcs_by_region = defaultdict(list)
-        for vpc in vpcs:
-            region = vpc.get("region", "us-east-1")
-            vpcs_by_region[region].append(vpc)
-        
-        # Generate region sections
-        for region in sorted(vpcs_by_region.keys()):
-            if vpcs_by_region[region]:
-                diagram_lines.append(f'        subgraph Region{region.replace("-", "")}["{region.upper()}"]')
-                for vpc in vpcs_by_region[region]:
-                    vpc_lines = self._generate_vpc_section(
-                        vpc, region, subnets, instances, load_balancers, rds_instances
-                    )
-                    # Add extra indentation for region subgraph
-                    vpc_lines = ["    " + line for line in vpc_lines]
-                    diagram_lines.extend(vpc_lines)
-                diagram_lines.append("        end")
+        diagram_lines.append(f'    subgraph Account["Account: {account_id}"]')
+        
+        # Group resources by VPC once rather than rescanning them for every VPC
+        subnets_by_vpc = group_by_vpc(subnets)
+        instances_by_vpc = group_by_vpc(instances)
+        load_balancers_by_vpc = group_by_vpc(load_balancers)
+        rds_by_vpc = group_by_vpc(rds_instances)
+        
+        # Group VPCs by region and generate region sections in sorted order
+        vpcs_by_region = groupby(sorted(vpcs, key=vpc_region), key=vpc_region)
+        for region, region_vpcs in vpcs_by_region:
+            diagram_lines.append(f'        subgraph Region{region.replace("-", "")}["{region.upper()}"]')
+            for vpc in region_vpcs:
+                vpc_id = vpc["vpc_id"]
+                # VPC sections are emitted already indented for the region subgraph
+                diagram_lines.extend(self._generate_vpc_section(
+                    vpc, region, subnets_by_vpc.get(vpc_id, []), instances_by_vpc.get(vpc_id, []),
+                    load_balancers_by_vpc.get(vpc_id, []), rds_by_vpc.get(vpc_id, [])
+                ))
+            diagram_lines.append("        end")
         
         diagram_lines.append("    end")
         
@@ -78,95 +90,89 @@ class MermaidDiagramGenerator:
         self,
         vpc: Dict[str, Any],
         region: str,
-        subnets: List[Dict[str, Any]],
-        instances: List[Dict[str, Any]],
-        load_balancers: List[Dict[str, Any]],
-        rds_instances: List[Dict[str, Any]]
+        vpc_subnets: List[Dict[str, Any]],
+        vpc_instances: List[Dict[str, Any]],
+        vpc_lbs: List[Dict[str, Any]],
+        vpc_rds: List[Dict[str, Any]]
     ) -> List[str]:
-        """Generate VPC section of the diagram."""
+        """Generate VPC section of the diagram from the resources that belong to it."""
         lines = []
         vpc_id = vpc["vpc_id"]
         vpc_name = vpc["tags"].get("Name", vpc_id)
         
-        lines.append(f'        subgraph VPC_{self._sanitize_id(vpc_id)}["VPC: {vpc_name}"]')
-        lines.append(f'            subgraph Region_{self._sanitize_id(region)}["Region: {region}"]')
-        
-        vpc_subnets = [s for s in subnets if s["vpc_id"] == vpc_id]
-        vpc_instances = [i for i in instances if i["vpc_id"] == vpc_id]
-        vpc_lbs = [lb for lb in load_balancers if lb["vpc_id"] == vpc_id]
-        vpc_rds = [rds for rds in rds_instances if rds["vpc_id"] == vpc_id]
+        lines.append(f'            subgraph VPC_{self._sanitize_id(vpc_id)}["VPC: {vpc_name}"]')
+        lines.append(f'                subgraph Region_{self._sanitize_id(region)}["Region: {region}"]')
         
         subnet_resources = self._organize_resources_by_subnet(
             vpc_subnets, vpc_instances, vpc_lbs, vpc_rds
         )
         
-        tier_order = ["presentation", "application", "restricted"]
-        for tier in tier_order:
-            tier_subnets = [s for s in vpc_subnets if s.get("tier") == tier]
-            if not tier_subnets:
-                continue
-            
-            for subnet in tier_subnets:
+        # Bucket subnets by tier in one pass, then emit them in tier order
+        subnets_by_tier = defaultdict(list)
+        for subnet in vpc_subnets:
+            subnets_by_tier[subnet.get("tier")].append(subnet)
+        
+        for tier in TIER_ORDER:
+            tier_label = TIER_LABELS[tier]
+            for subnet in subnets_by_tier.get(tier, []):
                 subnet_id = subnet["subnet_id"]
                 if subnet_id not in subnet_resources or not subnet_resources[subnet_id]:
                     continue
                 
                 subnet_lines = self._generate_subnet_section(
-                    subnet, subnet_resources[subnet_id]
+                    subnet, subnet_resources[subnet_id], tier_label
                 )
                 lines.extend(subnet_lines)
         
+        lines.append("                end")
         lines.append("            end")
-        lines.append("        end")
         
         return lines
     
     def _generate_subnet_section(
         self,
         subnet: Dict[str, Any],
-        resources: Dict[str, List[Dict[str, Any]]]
+        resources: Dict[str, List[Dict[str, Any]]],
+        tier_label: str
     ) -> List[str]:
-        """Generate subnet section of the diagram."""
+        """Generate subnet section of the diagram under the given tier label."""
         lines = []
         subnet_id = subnet["subnet_id"]
-        subnet_name = subnet["tags"].get("Name", subnet_id)
-        tier = subnet.get("tier", "unknown")
         
-        tier_labels = {
-            "presentation": "Public Subnet",
-            "application": "Application Subnet",
-            "restricted": "Restricted Subnet"
-        }
-        label = tier_labels.get(tier, f"Subnet: {subnet_name}")
+        lines.append(f'                    subgraph Subnet_{self._sanitize_id(subnet_id)}["{tier_label}"]')
         
-        lines.append(f'                subgraph Subnet_{self._sanitize_id(subnet_id)}["{label}"]')
+        get_node_id = self._get_node_id
+        node_map = self.node_map
         
         for lb in resources.get("load_balancers", []):
-            node_id = self._get_node_id(f"lb_{lb['name']}")
-            ips = "<br/>".join(lb.get("ips", []))
+            node_id = get_node_id(f"lb_{lb['name']}")
             node_label = f"{lb['type']}: {lb['name']}"
+            ips = lb.get("ips")
             if ips:
-                node_label += f"<br/>{ips}"
-            lines.append(f'                    {node_id}[/"{node_label}"\\]')
-            self.node_map[lb["arn"]] = node_id
+                node_label = "<br/>".join([node_label, *ips])
+            lines.append(f'                        {node_id}[/"{node_label}"\\]')
+            node_map[lb["arn"]] = node_id
         
         for instance in resources.get("instances", []):
-            node_id = self._get_node_id(f"ec2_{instance['instance_id']}")
-            name = instance.get("name", instance["instance_id"])
+            instance_id = instance["instance_id"]
+            node_id = get_node_id(f"ec2_{instance_id}")
+            name = instance.get("name", instance_id)
             ip = instance.get("private_ip", "no-ip")
-            node_label = f"EC2: {name}<br/>{ip}"
-            lines.append(f'                    {node_id}["{node_label}"]')
-            self.node_map[instance["instance_id"]] = node_id
+            lines.append(f'                        {node_id}["EC2: {name}<br/>{ip}"]')
+            node_map[instance_id] = node_id
         
         for rds in resources.get("rds", []):
-            node_id = self._get_node_id(f"rds_{rds['db_instance_id']}")
-            node_label = f"RDS: {rds['db_instance_id']}<br/>{rds['engine']}"
-            if rds.get("endpoint"):
-                node_label += f"<br/>{rds['endpoint']}"
-            lines.append(f'                    {node_id}[("{node_label}")]')
-            self.node_map[rds["db_instance_id"]] = node_id
-        
-        lines.append("                end")
+            db_instance_id = rds["db_instance_id"]
+            node_id = get_node_id(f"rds_{db_instance_id}")
+            endpoint = rds.get("endpoint")
+            node_label = (
+                f"RDS: {db_instance_id}<br/>{rds['engine']}<br/>{endpoint}" if endpoint
+                else f"RDS: {db_instance_id}<br/>{rds['engine']}"
+            )
+            lines.append(f'                        {node_id}[("{node_label}")]')
+            node_map[db_instance_id] = node_id
+        
+        lines.append("                    end")
         
         return lines
     
@@ -177,6 +183,7 @@ class MermaidDiagramGenerator:
     ) -> List[str]:
         """Generate Route53 section."""
         lines = []
+        lb_nodes_by_dns = index_load_balancer_nodes_by_dns(load_balancers, self.node_map)
         
         for zone in route53_zones:
             node_id = self._get_node_id(f"route53_{zone['zone_id']}")
@@ -184,16 +191,22 @@ class MermaidDiagramGenerator:
             lines.append(f'    {node_id}(["{node_label}"])')
             self.node_map[zone["zone_id"]] = node_id
             
+            if not lb_nodes_by_dns:
+                continue
+            
+            # A/AAAA alias pairs point at the same load balancer; link it once
+            linked_lb_nodes = set()
             for record in zone.get("records", []):
                 for value in record.get("values", []):
-                    for lb in load_balancers:
-                        if lb["dns_name"] in value:
-                            self.connections.append({
-                                "from": node_id,
-                                "to": self.node_map.get(lb["arn"]),
-                                "label": "53/tcp",
-                                "style": "standard"
-                            })
+                    lb_node = match_load_balancer_node(value, lb_nodes_by_dns)
+                    if lb_node and lb_node not in linked_lb_nodes:
+                        linked_lb_nodes.add(lb_node)
+                        self.connections.append({
+                            "from": node_id,
+                            "to": lb_node,
+                            "label": "53/tcp",
+                            "style": "standard"
+                        })
         
         return lines
     
@@ -213,14 +226,13 @@ class MermaidDiagramGenerator:
                 continue
             
             for tg in lb.get("target_groups", []):
-                port = tg.get("port", 443)
-                protocol = tg.get("protocol", "tcp").lower()
+                # Everything but the target node is shared by the target group's edges
+                edge_prefix = f'    {lb_node} ==>|"{tg.get("port", 443)}/{tg.get("protocol", "tcp").lower()}"| '
                 
                 for target in tg.get("targets", []):
-                    target_id = target["id"]
-                    target_node = self.node_map.get(target_id)
+                    target_node = self.node_map.get(target["id"])
                     if target_node:
-                        lines.append(f'    {lb_node} ==>|"{port}/{protocol}"| {target_node}')
+                        lines.append(edge_prefix + target_node)
         
         sg_connections = self._analyze_security_group_connections(
             instances, rds_instances, security_groups
@@ -230,11 +242,8 @@ class MermaidDiagramGenerator:
             from_node = self.node_map.get(conn["from"])
             to_node = self.node_map.get(conn["to"])
             if from_node and to_node:
-                label = conn.get("label", "")
-                if conn.get("type") == "database":
-                    lines.append(f'    {from_node} -.->|"{label}"| {to_node}')
-                else:
-                    lines.append(f'    {from_node} -->|"{label}"| {to_node}')
+                arrow = _SG_EDGE_ARROWS.get(conn["type"], "-->")
+                lines.append(f'    {from_node} {arrow}|"{conn["label"]}"| {to_node}')
         
         for conn in self.connections:
             if conn["from"] and conn["to"]:
@@ -282,51 +291,59 @@ class MermaidDiagramGenerator:
         """Analyze security group rules to determine connections."""
         connections = []
         
-        instance_sg_map = {}
+        instance_sg_map = defaultdict(list)
         for instance in instances:
+            instance_id = instance["instance_id"]
             for sg_id in instance.get("security_groups", []):
-                if sg_id not in instance_sg_map:
-                    instance_sg_map[sg_id] = []
-                instance_sg_map[sg_id].append(instance["instance_id"])
+                instance_sg_map[sg_id].append(instance_id)
         
-        rds_sg_map = {}
+        rds_sg_map = defaultdict(list)
         for rds in rds_instances:
+            db_instance_id = rds["db_instance_id"]
             for sg_id in rds.get("security_groups", []):
-                if sg_id not in rds_sg_map:
-                    rds_sg_map[sg_id] = []
-                rds_sg_map[sg_id].append(rds["db_instance_id"])
+                rds_sg_map[sg_id].append(db_instance_id)
         
         for sg_id, sg_info in security_groups.items():
+            to_instances = instance_sg_map.get(sg_id, [])
+            to_rds = rds_sg_map.get(sg_id, [])
+            
+            # Rules of a group with no drawn members cannot produce connections
+            if not to_instances and not to_rds:
+                continue
+            
             for rule in sg_info.get("rules", {}).get("ingress", []):
-                for source in rule.get("sources", []):
-                    if source["type"] == "security_group":
-                        source_sg = source["value"]
-                        
-                        from_instances = instance_sg_map.get(source_sg, [])
-                        to_instances = instance_sg_map.get(sg_id, [])
-                        to_rds = rds_sg_map.get(sg_id, [])
-                        
-                        port = rule.get("to_port", rule.get("from_port", ""))
-                        protocol = self._normalize_protocol(rule.get("protocol", "tcp"))
-                        label = f"{port}/{protocol}" if port else protocol
-                        
-                        for from_id in from_instances:
-                            for to_id in to_instances:
-                                if from_id != to_id:
-                                    connections.append({
-                                        "from": from_id,
-                                        "to": to_id,
-                                        "label": label,
-                                        "type": "instance"
-                                    })
-                            
-                            for to_id in to_rds:
+                source_sgs = [
+                    source["value"] for source in rule["sources"]
+                    if source["type"] == "security_group"
+                ]
+                if not source_sgs:
+                    continue
+                
+                # The label depends only on the rule, so build it once for all sources
+                port = rule.get("to_port", rule.get("from_port", ""))
+                protocol = normalize_protocol(rule.get("protocol", "tcp"))
+                label = f"{port}/{protocol}" if port else protocol
+                
+                for source_sg in source_sgs:
+                    from_instances = instance_sg_map.get(source_sg, [])
+                    
+                    for from_id in from_instances:
+                        for to_id in to_instances:
+                            if from_id != to_id:
                                 connections.append({
                                     "from": from_id,
                                     "to": to_id,
                                     "label": label,
-                                    "type": "database"
+                                    "type": "instance"
                                 })
+                        
+                        for to_id in to_rds:
+                            connections.append({
+                                "from": from_id,
+                                "to": to_id,
+                                "label": label,
+                                "type": "database"
+                            })
         
         return connections
     
@@ -339,18 +356,6 @@ class MermaidDiagramGenerator:
         """Sanitize text for use as Mermaid node ID."""
         return text.replace("-", "_").replace(".", "_").replace("/", "_")
     
-    def _normalize_protocol(self, protocol: str) -> str:
-        """Normalize protocol string."""
-        if protocol == "-1":
-            return "all"
-        elif protocol == "6":
-            return "tcp"
-        elif protocol == "17":
-            return "udp"
-        elif protocol == "1":
-            return "icmp"
-        return protocol.lower()
-    
     def save_diagram(self, diagram: str, output_path: str) -> None:
         """Save the diagram to a file."""
         with open(output_path, "w") as f:
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Test paginated AWS resource discovery."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import MagicMock, call, patch
+from botocore.exceptions import ClientError
+from src.aws_diagram_cli.aws_discovery import AWSResourceDiscovery
+
+
+def _vpc(vpc_id):
+    return {'VpcId': vpc_id, 'CidrBlock': '10.0.0.0/16', 'State': 'available'}
+
+
+def test_discovery_follows_pagination_tokens():
+    """Test that discovery reads every page instead of only the first."""
+    with patch('boto3.Session') as mock_session:
+        mock_ec2 = MagicMock()
+        mock_rds = MagicMock()
+        mock_session.return_value.client = lambda service, region_name=None: (
+            {'ec2': mock_ec2, 'rds': mock_rds}.get(service, MagicMock())
+        )
+
+        # EC2 style NextToken pagination
+        mock_ec2.describe_vpcs.side_effect = [
+            {'Vpcs': [_vpc('vpc-1'), _vpc('vpc-2')], 'NextToken': 'page-2'},
+            {'Vpcs': [_vpc('vpc-3')]},
+        ]
+
+        # RDS style Marker pagination
+        db = {
+            'DBInstanceIdentifier': 'db-1', 'Engine': 'postgres', 'EngineVersion': '15',
+            'DBInstanceClass': 'db.t3.micro', 'DBInstanceStatus': 'available',
+        }
+        mock_rds.describe_db_instances.side_effect = [
+            {'DBInstances': [db], 'Marker': 'page-2'},
+            {'DBInstances': [dict(db, DBInstanceIdentifier='db-2')]},
+        ]
+
+        discovery = AWSResourceDiscovery(regions=['us-east-1'])
+
+        vpcs = discovery.discover_vpcs()
+        assert [vpc['vpc_id'] for vpc in vpcs] == ['vpc-1', 'vpc-2', 'vpc-3']
+        assert mock_ec2.describe_vpcs.call_args_list[1] == call(MaxResults=1000, NextToken='page-2')
+
+        rds_instances = discovery.discover_rds_instances()
+        assert [db['db_instance_id'] for db in rds_instances] == ['db-1', 'db-2']
+        assert mock_rds.describe_db_instances.call_args_list[1] == call(MaxRecords=100, Marker='page-2')
+
+        print("✅ Pagination test passed!")
+
+
+def test_route53_zone_records():
+    """Test that each hosted zone gets its own, fully paginated, record sets."""
+    with patch('boto3.Session') as mock_session:
+        mock_route53 = MagicMock()
+        mock_session.return_value.client = lambda service, region_name=None: (
+            mock_route53 if service == 'route53' else MagicMock()
+        )
+
+        mock_route53.list_hosted_zones.return_value = {
+            'HostedZones': [
+                {'Id': f'/hostedzone/Z{i}', 'Name': f'zone{i}.example.com.', 'Config': {}}
+                for i in range(5)
+            ]
+        }
+
+        def list_records(HostedZoneId, StartRecordName=None, StartRecordType=None):
+            record = {'Type': 'CNAME', 'ResourceRecords': [{'Value': f'{HostedZoneId}.target'}]}
+            if StartRecordName is None:
+                return {
+                    'ResourceRecordSets': [dict(record, Name=f'www.{HostedZoneId}.')],
+                    'NextRecordName': f'api.{HostedZoneId}.',
+                    'NextRecordType': 'CNAME',
+                }
+            return {'ResourceRecordSets': [dict(record, Name=StartRecordName)]}
+
+        mock_route53.list_resource_record_sets.side_effect = list_records
+
+        discovery = AWSResourceDiscovery(regions=['us-east-1'])
+        zones = discovery.discover_route53_zones()
+
+        assert [zone['zone_id'] for zone in zones] == [f'Z{i}' for i in range(5)]
+        for zone in zones:
+            zone_id = zone['zone_id']
+            assert [record['name'] for record in zone['records']] == [f'www.{zone_id}.', f'api.{zone_id}.']
+
+        print("✅ Route53 zone records test passed!")
+
+
+def test_load_balancer_details():
+    """Test that target groups and listeners land on the right load balancer across pages."""
+    with patch('boto3.Session') as mock_session:
+        mock_elbv2 = MagicMock()
+        mock_session.return_value.client = lambda service, region_name=None: (
+            mock_elbv2 if service == 'elbv2' else MagicMock()
+        )
+
+        def lb(name):
+            return {
+                'LoadBalancerName': name, 'LoadBalancerArn': f'arn:{name}', 'Type': 'application',
+                'Scheme': 'internal', 'State': {'Code': 'active'}, 'VpcId': 'vpc-1',
+                'DNSName': f'{name}.elb.amazonaws.com', 'AvailabilityZones': [],
+            }
+
+        mock_elbv2.describe_load_balancers.side_effect = [
+            {'LoadBalancers': [lb('lb-1'), lb('lb-2')], 'NextMarker': 'page-2'},
+            {'LoadBalancers': [lb('lb-3')]},
+        ]
+        # Target groups are listed once per region, including one no discovered load balancer uses
+        mock_elbv2.describe_target_groups.return_value = {
+            'TargetGroups': [
+                {'TargetGroupName': f'arn:{name}-tg', 'TargetGroupArn': f'arn:{name}-tg',
+                 'LoadBalancerArns': [f'arn:{name}']}
+                for name in ('lb-1', 'lb-2', 'lb-3', 'lb-other')
+            ]
+        }
+        mock_elbv2.describe_target_health.side_effect = lambda TargetGroupArn: {
+            'TargetHealthDescriptions': [{'Target': {'Id': f'{TargetGroupArn}-i'}, 'TargetHealth': {'State': 'healthy'}}]
+        }
+        mock_elbv2.describe_listeners.side_effect = lambda LoadBalancerArn: {
+            'Listeners': [{'Port': 443, 'Protocol': 'HTTPS', 'Certificates': [{'CertificateArn': f'{LoadBalancerArn}-cert'}]}]
+        }
+
+        discovery = AWSResourceDiscovery(regions=['us-east-1'])
+        load_balancers = discovery.discover_load_balancers()
+
+        assert [lb['name'] for lb in load_balancers] == ['lb-1', 'lb-2', 'lb-3']
+        for lb_info in load_balancers:
+            arn = lb_info['arn']
+            assert [tg['arn'] for tg in lb_info['target_groups']] == [f'{arn}-tg']
+            assert [t['id'] for t in lb_info['target_groups'][0]['targets']] == [f'{arn}-tg-i']
+            assert lb_info['listeners'][0]['certificates'] == [f'{arn}-cert']
+        assert mock_elbv2.describe_target_groups.call_count == 1
+        assert mock_elbv2.describe_target_health.call_count == 3
+
+        print("✅ Load balancer details test passed!")
+
+
+def test_target_groups_kept_when_a_page_fails():
+    """Test that target groups from earlier pages survive a failed page."""
+    with patch('boto3.Session'):
+        mock_elbv2 = MagicMock()
+        mock_elbv2.describe_target_groups.side_effect = [
+            {'TargetGroups': [{'TargetGroupName': 'tg-1', 'TargetGroupArn': 'arn:tg-1',
+                               'LoadBalancerArns': ['arn:lb-1']}],
+             'NextMarker': 'page-2'},
+            ClientError({'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}}, 'DescribeTargetGroups'),
+        ]
+        mock_elbv2.describe_target_health.return_value = {
+            'TargetHealthDescriptions': [{'Target': {'Id': 'i-1'}, 'TargetHealth': {'State': 'healthy'}}]
+        }
+
+        discovery = AWSResourceDiscovery(regions=['us-east-1'])
+        target_groups_by_lb = discovery._get_target_groups_by_load_balancer({'arn:lb-1', 'arn:lb-2'}, mock_elbv2)
+
+        assert list(target_groups_by_lb) == ['arn:lb-1']
+        assert [t['id'] for t in target_groups_by_lb['arn:lb-1'][0]['targets']] == ['i-1']
+
+        print("✅ Target group page failure test passed!")
+
+
+if __name__ == "__main__":
+    test_discovery_follows_pagination_tokens()
+    test_route53_zone_records()
+    test_load_balancer_details()
+    test_target_groups_kept_when_a_page_fails()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Test Route53 record to load balancer matching."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aws_diagram_cli.generators.common import (
+    index_load_balancer_nodes_by_dns,
+    match_load_balancer_node,
+)
+
+
+def test_route53_alias_matching():
+    """Test that alias and CNAME values resolve to the right load balancer."""
+    load_balancers = [
+        {"arn": "arn:lb-web", "dns_name": "web-123.us-east-1.elb.amazonaws.com"},
+        {"arn": "arn:lb-api", "dns_name": "api-456.us-east-1.elb.amazonaws.com"},
+        {"arn": "arn:lb-pending", "dns_name": None},
+    ]
+
+    lb_nodes = {"arn:lb-web": "web_node", "arn:lb-api": "api_node", "arn:lb-pending": "pending_node"}
+    lb_nodes_by_dns = index_load_balancer_nodes_by_dns(load_balancers, lb_nodes)
+
+    def match(value):
+        return match_load_balancer_node(value, lb_nodes_by_dns)
+
+    # Alias targets carry a dualstack prefix and a trailing dot
+    assert match("dualstack.web-123.us-east-1.elb.amazonaws.com.") == "web_node"
+    # DNS names are case-insensitive
+    assert match("API-456.us-east-1.elb.amazonaws.com") == "api_node"
+    # Other records and shared suffixes must not match
+    assert match("10.0.0.1") is None
+    assert match("us-east-1.elb.amazonaws.com") is None
+    assert match("other-789.us-east-1.elb.amazonaws.com") is None
+
+    print("✅ Route53 matching test passed!")
+
+
+if __name__ == "__main__":
+    test_route53_alias_matching()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Test subnet tier classification."""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch
+from src.aws_diagram_cli.aws_discovery import AWSResourceDiscovery
+
+
+def test_subnet_tier_keywords():
+    """Test that subnet names map to tiers with presentation keywords taking priority."""
+    with patch('boto3.Session'):
+        discovery = AWSResourceDiscovery(regions=['us-east-1'])
+
+        assert discovery._determine_subnet_tier({'Name': 'Public-A'}) == 'presentation'
+        assert discovery._determine_subnet_tier({'Name': 'dmz-1'}) == 'presentation'
+        assert discovery._determine_subnet_tier({'Name': 'db-public'}) == 'presentation'
+        assert discovery._determine_subnet_tier({'Name': 'private-app'}) == 'application'
+        assert discovery._determine_subnet_tier({'Name': 'app-data'}) == 'application'
+        assert discovery._determine_subnet_tier({'Name': 'database'}) == 'restricted'
+        assert discovery._determine_subnet_tier({'Name': 'restricted'}) == 'restricted'
+        assert discovery._determine_subnet_tier({'Name': 'misc'}) == 'application'
+        assert discovery._determine_subnet_tier({}) == 'application'
+
+        print("✅ Subnet tier test passed!")
+
+
+if __name__ == "__main__":
+    test_subnet_tier_keywords()